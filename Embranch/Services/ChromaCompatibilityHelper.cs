@@ -1,6 +1,8 @@
 using Microsoft.Extensions.Logging;
 using Python.Runtime;
+using System.Text;
 using System.Text.Json;
+using System.Text.Json.Nodes;
 
 namespace Embranch.Services;
 
@@ -10,6 +12,16 @@ namespace Embranch.Services;
 /// </summary>
 public static class ChromaCompatibilityHelper
 {
+    /// <summary>
+    /// Known ChromaDB SQLite file names in order of preference. Any other *.sqlite3 file is the fallback.
+    /// </summary>
+    private static readonly string[] SqliteFileCandidates = { "chroma.sqlite3", "chroma.db", "database.db" };
+    
+    /// <summary>
+    /// Maximum number of collection names listed in a single summary log line
+    /// </summary>
+    private const int MaxLoggedNames = 10;
+    
     /// <summary>
     /// Attempts to migrate a ChromaDB database to fix "_type" configuration issues
     /// </summary>
@@ -17,6 +29,19 @@ public static class ChromaCompatibilityHelper
     /// <param name="dataPath">Path to the ChromaDB data directory</param>
     /// <returns>True if migration was successful or not needed, false if failed</returns>
     public static async Task<bool> MigrateDatabaseAsync(ILogger logger, string dataPath)
+    {
+        var (success, _) = await MigrateDatabaseWithCountAsync(logger, dataPath);
+        return success;
+    }
+    
+    /// <summary>
+    /// Attempts to migrate a ChromaDB database to fix "_type" configuration issues,
+    /// also reporting how many collection configurations were rewritten
+    /// </summary>
+    /// <param name="logger">Logger instance</param>
+    /// <param name="dataPath">Path to the ChromaDB data directory</param>
+    /// <returns>Whether migration succeeded or was not needed, and the number of collections updated</returns>
+    internal static async Task<(bool Success, int MigratedCount)> MigrateDatabaseWithCountAsync(ILogger logger, string dataPath)
     {
         logger.LogInformation($"Checking ChromaDB compatibility for database at: {dataPath}");
         
@@ -28,210 +53,490 @@ public static class ChromaCompatibilityHelper
                 
                 // Import required modules
                 dynamic sqlite3 = Py.Import("sqlite3");
-                dynamic json = Py.Import("json");
                 dynamic os = Py.Import("os");
                 
                 // Find the SQLite database file
-                string? sqlitePath = null;
-                var candidates = new[] { "chroma.sqlite3", "chroma.db" };
-                
-                foreach (var candidate in candidates)
-                {
-                    var candidatePath = Path.Combine(dataPath, candidate);
-                    if (File.Exists(candidatePath))
-                    {
-                        sqlitePath = candidatePath;
-                        break;
-                    }
-                }
+                string? sqlitePath = FindSqliteFile(dataPath);
                 
                 if (sqlitePath == null)
                 {
                     logger.LogWarning("No ChromaDB SQLite file found - database may be new or corrupted");
-                    return true; // Not necessarily an error for new databases
+                    return (true, 0); // Not necessarily an error for new databases
                 }
                 
                 logger.LogInformation($"Found ChromaDB SQLite file: {sqlitePath}");
                 
-                // Connect to the SQLite database
-                dynamic conn = sqlite3.connect(sqlitePath);
-                dynamic cursor = conn.cursor();
-                
-                // Check if collections table exists
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='collections';");
-                dynamic tableResult = cursor.fetchall();
-                
-                // Use Python's len() function to get list length
-                dynamic builtins = Py.Import("builtins");
-                int tableCount = (int)builtins.len(tableResult);
+                // The check itself only reads, so open read-only: no journal setup and no
+                // contention with a ChromaDB writer. Only the migration step below writes.
+                string configColumn = null;
+                var migrationsNeeded = new List<(string id, string name, string fixedConfig)>();
                 
-                if (tableCount == 0)
+                using (SqliteConnectionScope readScope = SqliteConnectionScope.OpenReadOnly(sqlite3, sqlitePath))
                 {
-                    logger.LogInformation("No collections table found - database appears to be empty");
-                    conn.close();
-                    return true;
-                }
+                    dynamic cursor = readScope.Connection.cursor();
+                    
+                    // Check for the collections table and read its columns in one round trip
+                    cursor.execute(
+                        "SELECT ti.name AS name FROM sqlite_master m JOIN pragma_table_info(m.name) ti " +
+                        "WHERE m.type = 'table' AND m.name = 'collections'");
+                    
+                    var columnNames = new HashSet<string>();
+                    foreach (dynamic column in cursor)
+                    {
+                        columnNames.Add(column["name"].ToString());
+                    }
                 
-                // Check which configuration column exists (different ChromaDB versions use different names)
-                cursor.execute("PRAGMA table_info(collections);");
-                dynamic columnInfo = cursor.fetchall();
+                    if (columnNames.Count == 0)
+                    {
+                        logger.LogInformation("No collections table found - database appears to be empty");
+                        return (true, 0);
+                    }
                 
-                string configColumn = null;
-                foreach (dynamic column in columnInfo)
-                {
-                    string columnName = column[1].ToString();
-                    if (columnName == "configuration_json_str")
+                    // Check which configuration column exists (different ChromaDB versions use different names)
+                    if (columnNames.Contains("configuration_json_str"))
                     {
                         configColumn = "configuration_json_str";
-                        break;
                     }
-                    else if (columnName == "config_json_str")
+                    else if (columnNames.Contains("config_json_str"))
                     {
                         configColumn = "config_json_str";
-                        break;
                     }
-                }
-                
-                if (configColumn == null)
-                {
-                    logger.LogWarning("No configuration column found in collections table - unknown database schema");
-                    conn.close();
-                    return true; // Not necessarily an error for very new or different schemas
-                }
-                
-                logger.LogInformation($"Using configuration column: {configColumn}");
-                
-                // Get collections with their configurations
-                cursor.execute($"SELECT id, name, {configColumn} FROM collections");
-                dynamic rows = cursor.fetchall();
                 
-                int collectionsCount = (int)builtins.len(rows);
-                logger.LogInformation($"Found {collectionsCount} collections to check");
+                    if (configColumn == null)
+                    {
+                        logger.LogWarning("No configuration column found in collections table - unknown database schema");
+                        return (true, 0); // Not necessarily an error for very new or different schemas
+                    }
                 
-                if (collectionsCount == 0)
-                {
-                    conn.close();
-                    return true;
-                }
+                    logger.LogInformation($"Using configuration column: {configColumn}");
                 
-                bool needsMigration = false;
-                var migrationsNeeded = new List<(string id, string name, string fixedConfig)>();
+                    // Get collections with their configurations. With JSON1 available, the "is problematic"
+                    // check is pushed into SQLite so healthy configurations never cross into .NET;
+                    // the checks below still run on every returned row either way.
+                    bool filterInSqlite = SupportsJson1(cursor);
+                    string problematicFilter = filterInSqlite
+                        ? $" WHERE CASE WHEN json_valid({configColumn}) THEN json_type({configColumn}, '$._type') IS NULL ELSE 1 END"
+                        : string.Empty;
+                    cursor.execute($"SELECT id, name, {configColumn} FROM collections{problematicFilter}");
+                    int collectionsCount = 0;
+                    
+                    // Routine per-collection findings are collected and logged once after the scan;
+                    // configurations that have to be replaced are logged individually as errors
+                    var issues = new List<string>();
+                    
+                    // Per-collection detail is only produced at debug level - checked once so the
+                    // interpolated messages are not built for every row when nobody reads them
+                    bool verbose = logger.IsEnabled(LogLevel.Debug);
                 
-                // Check each collection's configuration
-                foreach (dynamic row in rows)
-                {
-                    string collectionId = row[0].ToString();
-                    string collectionName = row[1].ToString();
-                    string? configJsonStr = row[2]?.ToString();
+                    // Check each collection's configuration, streaming rows from the cursor
+                    // rather than materializing every configuration blob up front
+                    foreach (dynamic row in cursor)
+                    {
+                        collectionsCount++;
+                        string collectionId = row["id"].ToString();
+                        string collectionName = row["name"].ToString();
+                        string? configJsonStr = row[configColumn]?.ToString();
                     
-                    logger.LogDebug($"Checking collection: {collectionName}");
+                        if (verbose)
+                        {
+                            logger.LogDebug($"Checking collection: {collectionName}");
+                        }
                     
-                    // Handle different configuration patterns based on database schema
-                    bool needsConfigFix = false;
-                    string? fixedConfig = null;
+                        // Handle different configuration patterns based on database schema
+                        bool needsConfigFix = false;
+                        string? fixedConfig = null;
                     
-                    if (string.IsNullOrEmpty(configJsonStr) || configJsonStr.Trim() == "{}")
-                    {
-                        // For older ChromaDB versions, empty/null config causes '_type' errors in newer versions
-                        // We need to add a minimal configuration to make it compatible
-                        logger.LogWarning($"Collection {collectionName} has empty configuration (older schema) - will add minimal config for compatibility");
-                        fixedConfig = CreateDefaultConfiguration();
-                        needsConfigFix = true;
-                    }
-                    else
-                    {
-                        try
+                        if (string.IsNullOrEmpty(configJsonStr) || configJsonStr.Trim() == "{}")
                         {
-                            // Parse the JSON configuration
-                            dynamic config = json.loads(configJsonStr);
+                            // For older ChromaDB versions, empty/null config causes '_type' errors in newer versions
+                            // We need to add a minimal configuration to make it compatible
+                            issues.Add($"{collectionName} (empty configuration, older schema)");
+                            fixedConfig = CreateDefaultConfiguration();
+                            needsConfigFix = true;
+                        }
+                        else
+                        {
+                            // Only look at top-level keys first; configurations can embed large embedding
+                            // function arguments that we do not want to materialize just to find "_type"
+                            bool? hasType = HasTopLevelProperty(configJsonStr, "_type");
                             
-                            // Check if _type field exists
-                            bool hasType = false;
-                            try
+                            if (hasType == true)
                             {
-                                var typeField = config["_type"];
-                                hasType = true;
+                                if (verbose)
+                                {
+                                    logger.LogDebug($"Collection {collectionName} configuration is OK");
+                                }
                             }
-                            catch (PythonException ex) when (ex.Message.Contains("KeyError"))
+                            else if (hasType == null)
                             {
-                                hasType = false;
-                            }
-                            
-                            if (!hasType)
-                            {
-                                logger.LogWarning($"Collection {collectionName} missing '_type' field - will fix");
-                                
-                                // Add the missing _type field
-                                config["_type"] = new PyString("CollectionConfigurationInternal");
-                                fixedConfig = json.dumps(config).ToString();
-                                needsConfigFix = true;
+                                // The strict reader also rejects NaN/Infinity, which ChromaDB itself loads
+                                // fine - only replace the configuration if Python cannot load it either
+                                var (pythonHasType, pythonFixedConfig, parseError) = CheckConfigurationWithPython(configJsonStr);
+                                if (pythonHasType)
+                                {
+                                    if (verbose)
+                                    {
+                                        logger.LogDebug($"Collection {collectionName} configuration is OK");
+                                    }
+                                }
+                                else if (pythonFixedConfig != null)
+                                {
+                                    issues.Add($"{collectionName} (missing '_type' field)");
+                                    fixedConfig = pythonFixedConfig;
+                                    needsConfigFix = true;
+                                }
+                                else
+                                {
+                                    logger.LogError($"Collection {collectionName} has an unparseable configuration and will be reset to the default: {parseError}");
+                                    fixedConfig = CreateDefaultConfiguration();
+                                    needsConfigFix = true;
+                                }
                             }
                             else
                             {
-                                logger.LogDebug($"Collection {collectionName} configuration is OK");
+                                // Materialize the configuration only now, so the fix keeps all existing settings.
+                                // System.Text.Json rejects duplicate keys that ChromaDB's json.loads accepts,
+                                // so let Python add the field before giving up on the existing settings.
+                                fixedConfig = TryAddTypeField(configJsonStr);
+                                string? parseError = null;
+                                if (fixedConfig == null)
+                                {
+                                    // Deconstruct into a declaration: in an assignment, '_' would bind to the GIL local
+                                    var (_, pythonFixedConfig, pythonError) = CheckConfigurationWithPython(configJsonStr);
+                                    fixedConfig = pythonFixedConfig;
+                                    parseError = pythonError;
+                                }
+
+                                if (fixedConfig != null)
+                                {
+                                    issues.Add($"{collectionName} (missing '_type' field)");
+                                }
+                                else
+                                {
+                                    logger.LogError($"Collection {collectionName} has an unparseable configuration and will be reset to the default: {parseError}");
+                                    fixedConfig = CreateDefaultConfiguration();
+                                }
+                                needsConfigFix = true;
                             }
                         }
-                        catch (Exception ex)
+                    
+                        if (needsConfigFix && fixedConfig != null)
                         {
-                            logger.LogError($"Failed to parse configuration for collection {collectionName}: {ex.Message}");
-                            fixedConfig = CreateDefaultConfiguration();
-                            needsConfigFix = true;
+                            migrationsNeeded.Add((collectionId, collectionName, fixedConfig));
                         }
                     }
-                    
-                    if (needsConfigFix && fixedConfig != null)
+                
+                    logger.LogInformation(filterInSqlite
+                        ? $"Found {collectionsCount} collections with a missing or invalid configuration"
+                        : $"Checked {collectionsCount} collections");
+                    if (issues.Count > 0)
                     {
-                        migrationsNeeded.Add((collectionId, collectionName, fixedConfig));
-                        needsMigration = true;
+                        logger.LogWarning($"{issues.Count} collections need a configuration fix: {SummarizeNames(issues)}");
                     }
                 }
                 
-                // Apply migrations if needed
-                if (needsMigration)
+                if (migrationsNeeded.Count == 0)
                 {
-                    logger.LogInformation($"Applying migration to {migrationsNeeded.Count} collections");
-                    
-                    cursor.execute("BEGIN TRANSACTION");
+                    logger.LogInformation("Database configuration is compatible - no migration needed");
+                    return (true, 0);
+                }
+                
+                // Apply migrations on a separate read-write connection
+                logger.LogInformation($"Applying migration to {migrationsNeeded.Count} collections");
+                
+                using (SqliteConnectionScope writeScope = SqliteConnectionScope.OpenReadWrite(logger, sqlite3, sqlitePath))
+                {
+                    dynamic writeCursor = writeScope.Connection.cursor();
+                    writeCursor.execute("BEGIN TRANSACTION");
                     
                     try
                     {
-                        foreach (var (id, name, fixedConfig) in migrationsNeeded)
+                        // Bind all updates up front and hand them to SQLite in a single executemany call
+                        var parameters = new PyList();
+                        foreach (var (id, _, fixedConfig) in migrationsNeeded)
                         {
-                            logger.LogInformation($"Updating configuration for collection: {name}");
-                            cursor.execute(
-                                $"UPDATE collections SET {configColumn} = ? WHERE id = ?",
-                                new PyTuple(new PyObject[] { new PyString(fixedConfig), new PyString(id) })
-                            );
+                            parameters.Append(new PyTuple(new PyObject[] { new PyString(fixedConfig), new PyString(id) }));
                         }
                         
-                        cursor.execute("COMMIT");
+                        logger.LogInformation($"Updating configuration for collections: {SummarizeNames(migrationsNeeded.Select(m => m.name).ToList())}");
+                        writeCursor.executemany($"UPDATE collections SET {configColumn} = ? WHERE id = ?", parameters);
+                        
+                        writeCursor.execute("COMMIT");
                         logger.LogInformation("Migration completed successfully");
                     }
                     catch (Exception ex)
                     {
-                        cursor.execute("ROLLBACK");
+                        writeCursor.execute("ROLLBACK");
                         logger.LogError($"Migration failed, rolled back: {ex.Message}");
-                        conn.close();
-                        return false;
+                        return (false, 0);
                     }
+                    
+                    return (true, migrationsNeeded.Count);
                 }
-                else
-                {
-                    logger.LogInformation("Database configuration is compatible - no migration needed");
-                }
-                
-                conn.close();
-                return true;
-                
             }
             catch (Exception ex)
             {
                 logger.LogError(ex, "Error during database compatibility check/migration");
-                return false;
+                return (false, 0);
             }
         }, timeoutMs: 60000, operationName: "MigrateDatabase");
     }
     
+    /// <summary>
+    /// Finds the ChromaDB SQLite file in a data directory using a single directory enumeration.
+    /// Known file names are preferred in priority order, falling back to any *.sqlite3 file.
+    /// </summary>
+    /// <param name="dataPath">Path to the ChromaDB data directory</param>
+    /// <returns>Absolute path of the best matching SQLite file, or null if none was found</returns>
+    internal static string? FindSqliteFile(string dataPath)
+    {
+        if (!Directory.Exists(dataPath))
+            return null;
+        
+        var fullDataPath = Path.GetFullPath(dataPath);
+        
+        // Windows and macOS (APFS/HFS+) are case-insensitive by default, so Chroma.sqlite3 still counts
+        // as chroma.sqlite3 there; other platforms compare file names exactly
+        var present = new HashSet<string>(OperatingSystem.IsWindows() || OperatingSystem.IsMacOS()
+            ? StringComparer.OrdinalIgnoreCase
+            : StringComparer.Ordinal);
+        string? fallbackName = null;
+        
+        foreach (var file in new DirectoryInfo(fullDataPath).EnumerateFiles())
+        {
+            present.Add(file.Name);
+            
+            // Pick the fallback deterministically rather than in enumeration order
+            if (file.Name.EndsWith(".sqlite3", StringComparison.OrdinalIgnoreCase) &&
+                (fallbackName == null || string.CompareOrdinal(file.Name, fallbackName) < 0))
+            {
+                fallbackName = file.Name;
+            }
+        }
+        
+        foreach (var candidate in SqliteFileCandidates)
+        {
+            // Return the name as it is on disk, not the candidate's casing
+            if (present.TryGetValue(candidate, out var fileName))
+                return Path.Combine(fullDataPath, fileName);
+        }
+        
+        return fallbackName != null ? Path.Combine(fullDataPath, fallbackName) : null;
+    }
+
+    
+    /// <summary>
+    /// Checks whether a JSON document is an object with the given top-level property, without
+    /// building the document tree. Nested values are skipped rather than materialized; the whole
+    /// document is still read so malformed JSON is never reported as having the property.
+    /// </summary>
+    /// <param name="json">JSON text to inspect</param>
+    /// <param name="propertyName">Top-level property name to look for</param>
+    /// <returns>
+    /// True or false for a JSON object, null if the text is not an object or not strictly valid JSON
+    /// (NaN/Infinity and other Python json extensions included)
+    /// </returns>
+    internal static bool? HasTopLevelProperty(string json, string propertyName)
+    {
+        try
+        {
+            var reader = new Utf8JsonReader(Encoding.UTF8.GetBytes(json));
+            if (!reader.Read() || reader.TokenType != JsonTokenType.StartObject)
+                return null;
+            
+            bool found = false;
+            while (reader.Read() && reader.TokenType == JsonTokenType.PropertyName)
+            {
+                found |= reader.ValueTextEquals(propertyName);
+                
+                reader.Read();
+                reader.Skip();
+            }
+            
+            // Read past the closing brace so trailing garbage is still reported as invalid
+            while (reader.Read())
+            {
+            }
+            return found;
+        }
+        catch (JsonException)
+        {
+            return null;
+        }
+    }
+    
+    /// <summary>
+    /// Joins names for a log line, listing at most maxNames of them so a database with many
+    /// collections does not produce an unbounded message
+    /// </summary>
+    internal static string SummarizeNames(IReadOnlyList<string> names, int maxNames = MaxLoggedNames)
+    {
+        if (names.Count <= maxNames)
+            return string.Join(", ", names);
+
+        return $"{string.Join(", ", names.Take(maxNames))} and {names.Count - maxNames} more";
+    }
+
+    /// <summary>
+    /// Adds the "_type" field to a configuration object, keeping all existing settings
+    /// </summary>
+    /// <returns>The fixed configuration, or null if System.Text.Json cannot load it as an object</returns>
+    private static string? TryAddTypeField(string configJsonStr)
+    {
+        try
+        {
+            if (JsonNode.Parse(configJsonStr) is not JsonObject config)
+                return null;
+
+            config["_type"] = "CollectionConfigurationInternal";
+            return config.ToJsonString();
+        }
+        catch (Exception ex) when (ex is JsonException || ex is ArgumentException)
+        {
+            // ArgumentException is raised for duplicate property names
+            return null;
+        }
+    }
+
+    /// <summary>
+    /// Checks a configuration with Python's json module, which is what ChromaDB itself uses and which
+    /// accepts NaN/Infinity and duplicate keys. Must be called on the Python thread with the GIL held.
+    /// </summary>
+    /// <returns>
+    /// HasType when the configuration already has "_type"; otherwise FixedConfig with the field added,
+    /// or Error when Python cannot load the configuration as an object either
+    /// </returns>
+    private static (bool HasType, string? FixedConfig, string? Error) CheckConfigurationWithPython(string configJsonStr)
+    {
+        dynamic json = Py.Import("json");
+        dynamic builtins = Py.Import("builtins");
+
+        dynamic config;
+        try
+        {
+            config = json.loads(configJsonStr);
+        }
+        catch (PythonException ex)
+        {
+            return (false, null, ex.Message);
+        }
+
+        if (!(bool)builtins.isinstance(config, builtins.dict))
+            return (false, null, "configuration is not a JSON object");
+
+        if ((bool)config.__contains__("_type"))
+            return (true, null, null);
+
+        config["_type"] = new PyString("CollectionConfigurationInternal");
+        string fixedConfig = json.dumps(config).ToString();
+        return (false, fixedConfig, null);
+    }
+
+    /// <summary>
+    /// Builds a SQLite file: URI for a database path. SQLite only accepts an empty or "localhost"
+    /// authority, so for UNC paths (\\server\share\...) the host is moved into the path
+    /// (file:////server/share/...) instead of becoming the URI authority.
+    /// </summary>
+    internal static string BuildSqliteFileUri(string sqlitePath)
+    {
+        var uri = new Uri(sqlitePath);
+        return uri.IsUnc
+            ? $"file:////{uri.Host}{uri.AbsolutePath}"
+            : uri.AbsoluteUri;
+    }
+    
+    /// <summary>
+    /// Checks whether the SQLite library behind Python's sqlite3 module has the JSON1 functions.
+    /// They are built in from SQLite 3.38 but optional in older builds.
+    /// </summary>
+    private static bool SupportsJson1(dynamic cursor)
+    {
+        try
+        {
+            cursor.execute("SELECT json_valid('{}')");
+            cursor.fetchone();
+            return true;
+        }
+        catch (PythonException)
+        {
+            return false;
+        }
+    }
+    
+    /// <summary>
+    /// Owns a Python sqlite3 connection for the duration of a using block, the C# counterpart of
+    /// Python's "with closing(sqlite3.connect(...))". Must be created and disposed on the Python thread.
+    /// </summary>
+    private sealed class SqliteConnectionScope : IDisposable
+    {
+        private readonly PyObject _connection;
+        private readonly ILogger? _optimizeLogger;
+        
+        /// <param name="connection">Open sqlite3.Connection</param>
+        /// <param name="optimizeLogger">When set, PRAGMA optimize runs on close and failures are logged here</param>
+        private SqliteConnectionScope(PyObject connection, ILogger? optimizeLogger)
+        {
+            _connection = connection;
+            _optimizeLogger = optimizeLogger;
+        }
+        
+        /// <summary>
+        /// The underlying sqlite3.Connection
+        /// </summary>
+        public dynamic Connection => _connection;
+        
+        /// <summary>
+        /// Opens a read-only connection through a file: URI; rows are returned as sqlite3.Row
+        /// so columns can be read by name
+        /// </summary>
+        public static SqliteConnectionScope OpenReadOnly(dynamic sqlite3, string sqlitePath)
+        {
+            PyObject connection = sqlite3.connect($"{BuildSqliteFileUri(sqlitePath)}?mode=ro", uri: true);
+            ((dynamic)connection).row_factory = sqlite3.Row;
+            return new SqliteConnectionScope(connection, optimizeLogger: null);
+        }
+        
+        /// <summary>
+        /// Opens a read-write connection. Planner statistics are refreshed on close, which a read-only
+        /// connection cannot do since it may not write sqlite_stat1. The connection is short-lived, so
+        /// the long-lived "optimize on open" form is not used.
+        /// </summary>
+        public static SqliteConnectionScope OpenReadWrite(ILogger logger, dynamic sqlite3, string sqlitePath)
+        {
+            PyObject connection = sqlite3.connect(sqlitePath);
+            return new SqliteConnectionScope(connection, optimizeLogger: logger);
+        }
+        
+        public void Dispose()
+        {
+            if (_optimizeLogger != null)
+            {
+                // Let SQLite refresh planner statistics before the connection goes away
+                RunOptimize(_optimizeLogger, _connection, "PRAGMA analysis_limit=400", "PRAGMA optimize");
+            }
+            Connection.close();
+        }
+    }
+    
+    /// <summary>
+    /// Runs SQLite "PRAGMA optimize" statements on a Python sqlite3 connection.
+    /// Failures are logged and ignored - refreshing planner statistics is best effort only.
+    /// </summary>
+    private static void RunOptimize(ILogger logger, dynamic conn, params string[] pragmas)
+    {
+        try
+        {
+            foreach (var pragma in pragmas)
+            {
+                conn.execute(pragma);
+            }
+        }
+        catch (PythonException ex)
+        {
+            logger.LogDebug($"Skipping SQLite optimize: {ex.Message}");
+        }
+    }
+    
     /// <summary>
     /// Creates a default ChromaDB collection configuration compatible with ChromaDB 0.6.x
     /// </summary>
@@ -251,16 +556,30 @@ public static class ChromaCompatibilityHelper
     /// Validates that a ChromaDB client can successfully connect and list collections
     /// </summary>
     public static async Task<bool> ValidateClientConnectionAsync(ILogger logger, string dataPath)
+    {
+        var (success, _) = await TryClientConnectionAsync(logger, dataPath);
+        return success;
+    }
+    
+    /// <summary>
+    /// Attempts a ChromaDB client connection and classifies the failure, if any
+    /// </summary>
+    /// <param name="logger">Logger instance</param>
+    /// <param name="dataPath">Path to the ChromaDB data directory</param>
+    /// <returns>Whether the connection succeeded, and whether it failed with a "_type" configuration error</returns>
+    internal static async Task<(bool Success, bool IsTypeError)> TryClientConnectionAsync(ILogger logger, string dataPath)
     {
         logger.LogInformation("Validating ChromaDB client connection");
         
         return await PythonContext.ExecuteAsync(() =>
         {
+            string chromaVersion = "unknown";
             try
             {
                 using var _ = Py.GIL();
                 
                 dynamic chromadb = Py.Import("chromadb");
+                chromaVersion = chromadb.__version__.ToString();
                 dynamic client = chromadb.PersistentClient(path: dataPath);
                 
                 // Try to list collections - this is where the "_type" error typically occurs
@@ -270,25 +589,24 @@ public static class ChromaCompatibilityHelper
                 dynamic builtins = Py.Import("builtins");
                 int collectionsCount = (int)builtins.len(collections);
                 
-                logger.LogInformation($"Successfully connected to ChromaDB - found {collectionsCount} collections");
-                return true;
+                logger.LogInformation($"Successfully connected to ChromaDB {chromaVersion} - found {collectionsCount} collections");
+                return (true, false);
             }
             catch (PythonException ex)
             {
                 if (ex.Message.Contains("_type"))
                 {
-                    logger.LogWarning($"ChromaDB '_type' compatibility issue detected: {ex.Message}");
-                }
-                else
-                {
-                    logger.LogError($"ChromaDB connection failed: {ex.Message}");
+                    logger.LogWarning($"ChromaDB {chromaVersion} '_type' compatibility issue detected: {ex.Message}");
+                    return (false, true);
                 }
-                return false;
+                
+                logger.LogError($"ChromaDB connection failed: {ex.Message}");
+                return (false, false);
             }
             catch (Exception ex)
             {
                 logger.LogError($"Unexpected error connecting to ChromaDB: {ex.Message}");
-                return false;
+                return (false, false);
             }
         }, timeoutMs: 30000, operationName: "ValidateClientConnection");
     }
@@ -301,7 +619,8 @@ public static class ChromaCompatibilityHelper
         logger.LogInformation("Starting ChromaDB compatibility check");
         
         // First, try to validate connection without migration
-        if (await ValidateClientConnectionAsync(logger, dataPath))
+        var (connected, isTypeError) = await TryClientConnectionAsync(logger, dataPath);
+        if (connected)
         {
             logger.LogInformation("ChromaDB connection successful - no migration needed");
             return true;
@@ -310,12 +629,21 @@ public static class ChromaCompatibilityHelper
         // If connection failed, attempt migration
         logger.LogInformation("Connection failed - attempting database migration");
         
-        if (!await MigrateDatabaseAsync(logger, dataPath))
+        var (migrated, migratedCount) = await MigrateDatabaseWithCountAsync(logger, dataPath);
+        if (!migrated)
         {
             logger.LogError("Database migration failed");
             return false;
         }
         
+        // Each connection attempt pays the full PersistentClient startup cost. If the failure was a
+        // "_type" error and nothing was rewritten, a second attempt would fail the same way.
+        if (isTypeError && migratedCount == 0)
+        {
+            logger.LogError("ChromaDB '_type' error persists but no collection configurations needed fixing - skipping second connection attempt");
+            return false;
+        }
+        
         // Validate connection again after migration
         if (await ValidateClientConnectionAsync(logger, dataPath))
         {
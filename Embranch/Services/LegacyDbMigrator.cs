@@ -283,26 +283,28 @@ namespace Embranch.Services
         }
 
         /// <summary>
-        /// Copies a directory recursively including all files and subdirectories
+        /// Copies a directory recursively including all files and subdirectories.
+        /// Files are copied concurrently; File.Copy clones the data instead of copying bytes
+        /// on copy-on-write filesystems (Btrfs/XFS reflink, APFS). Hardlinks are deliberately not
+        /// used because ChromaDB opens the migrated copy read-write and would modify the original.
         /// </summary>
         private async Task CopyDirectoryAsync(string sourceDir, string destDir)
         {
-            // Create destination directory if it doesn't exist
+            // Create destination directory tree up front so file copies can run in any order
             Directory.CreateDirectory(destDir);
-
-            // Copy all files
-            foreach (var file in Directory.GetFiles(sourceDir))
+            foreach (var dir in Directory.EnumerateDirectories(sourceDir, "*", SearchOption.AllDirectories))
             {
-                var destFile = Path.Combine(destDir, Path.GetFileName(file));
-                await Task.Run(() => File.Copy(file, destFile, overwrite: true));
+                Directory.CreateDirectory(Path.Combine(destDir, Path.GetRelativePath(sourceDir, dir)));
             }
 
-            // Recursively copy subdirectories
-            foreach (var dir in Directory.GetDirectories(sourceDir))
+            // Copy all files - HNSW segment files are independent, so copy them in parallel
+            var files = Directory.EnumerateFiles(sourceDir, "*", SearchOption.AllDirectories);
+            await Parallel.ForEachAsync(files, (file, _) =>
             {
-                var destSubDir = Path.Combine(destDir, Path.GetFileName(dir));
-                await CopyDirectoryAsync(dir, destSubDir);
-            }
+                var destFile = Path.Combine(destDir, Path.GetRelativePath(sourceDir, file));
+                File.Copy(file, destFile, overwrite: true);
+                return ValueTask.CompletedTask;
+            });
         }
 
         #endregion
@@ -0,0 +1,119 @@
+using Embranch.Services;
+using Microsoft.Data.Sqlite;
+using Microsoft.Extensions.Logging;
+using NUnit.Framework;
+using System.Text.Json.Nodes;
+
+namespace EmbranchTesting.IntegrationTests;
+
+/// <summary>
+/// Integration tests for the collection configuration fix-up in ChromaCompatibilityHelper.
+/// Uses a minimal hand-built chroma.sqlite3 so each configuration shape can be checked on its own.
+/// Uses EmbranchTesting namespace for GlobalTestSetup PythonContext initialization.
+/// </summary>
+[TestFixture]
+public class ChromaConfigurationMigrationTests
+{
+    private ILogger<ChromaConfigurationMigrationTests>? _logger;
+    private string _testDatabasePath = null!;
+    private string _sqlitePath = null!;
+
+    [SetUp]
+    public void SetUp()
+    {
+        using var loggerFactory = LoggerFactory.Create(builder => builder.AddConsole().SetMinimumLevel(LogLevel.Debug));
+        _logger = loggerFactory.CreateLogger<ChromaConfigurationMigrationTests>();
+
+        // PythonContext should be initialized by GlobalTestSetup
+        if (!PythonContext.IsInitialized)
+        {
+            Assert.Fail("PythonContext should be initialized by GlobalTestSetup");
+        }
+
+        _testDatabasePath = Path.Combine(Path.GetTempPath(), $"ChromaConfigMigrationTest_{Guid.NewGuid():N}");
+        Directory.CreateDirectory(_testDatabasePath);
+        _sqlitePath = Path.Combine(_testDatabasePath, "chroma.sqlite3");
+    }
+
+    [TearDown]
+    public void TearDown()
+    {
+        if (Directory.Exists(_testDatabasePath))
+        {
+            try
+            {
+                Directory.Delete(_testDatabasePath, recursive: true);
+            }
+            catch
+            {
+                // Ignore cleanup errors
+            }
+        }
+    }
+
+    /// <summary>
+    /// Verifies that configurations Python's json module accepts but System.Text.Json rejects keep their
+    /// settings, and that only truly unparseable configurations are replaced with the default
+    /// </summary>
+    [Test]
+    public async Task MigrateDatabase_LenientJsonConfigurations_KeepsExistingSettings()
+    {
+        const string nanWithType = "{\"_type\":\"CollectionConfigurationInternal\",\"hnsw\":{\"ef\":NaN}}";
+        CreateCollectionsTable(
+            ("nan_with_type", nanWithType),
+            ("nan_without_type", "{\"hnsw\":{\"space\":\"ip\",\"ef\":NaN}}"),
+            ("dup", "{\"hnsw\":{\"space\":\"l2\"},\"hnsw\":{\"space\":\"cosine\"}}"),
+            ("broken", "{not json"));
+
+        var (success, migratedCount) = await ChromaCompatibilityHelper.MigrateDatabaseWithCountAsync(_logger!, _testDatabasePath);
+
+        Assert.That(success, Is.True);
+        Assert.That(migratedCount, Is.EqualTo(3));
+
+        Assert.That(ReadConfiguration("nan_with_type"), Is.EqualTo(nanWithType), "Healthy configuration must not be rewritten");
+
+        var nanWithoutType = ReadConfiguration("nan_without_type");
+        Assert.That(nanWithoutType, Does.Contain("\"_type\": \"CollectionConfigurationInternal\""));
+        Assert.That(nanWithoutType, Does.Contain("\"space\": \"ip\""));
+        Assert.That(nanWithoutType, Does.Contain("NaN"));
+
+        var dup = JsonNode.Parse(ReadConfiguration("dup"))!.AsObject();
+        Assert.That((string?)dup["_type"], Is.EqualTo("CollectionConfigurationInternal"));
+        Assert.That((string?)dup["hnsw"]!["space"], Is.EqualTo("cosine"), "Python keeps the last duplicate key");
+
+        Assert.That(ReadConfiguration("broken"), Is.EqualTo("{\"_type\":\"CollectionConfigurationInternal\"}"));
+    }
+
+    private void CreateCollectionsTable(params (string Name, string Configuration)[] collections)
+    {
+        using var connection = new SqliteConnection($"Data Source={_sqlitePath};Pooling=False");
+        connection.Open();
+
+        using (var create = connection.CreateCommand())
+        {
+            create.CommandText = "CREATE TABLE collections (id TEXT PRIMARY KEY, name TEXT NOT NULL, configuration_json_str TEXT)";
+            create.ExecuteNonQuery();
+        }
+
+        foreach (var (name, configuration) in collections)
+        {
+            using var insert = connection.CreateCommand();
+            insert.CommandText = "INSERT INTO collections (id, name, configuration_json_str) VALUES ($id, $name, $config)";
+            insert.Parameters.AddWithValue("$id", Guid.NewGuid().ToString());
+            insert.Parameters.AddWithValue("$name", name);
+            insert.Parameters.AddWithValue("$config", configuration);
+            insert.ExecuteNonQuery();
+        }
+    }
+
+    private string ReadConfiguration(string name)
+    {
+        using var connection = new SqliteConnection($"Data Source={_sqlitePath};Mode=ReadOnly;Pooling=False");
+        connection.Open();
+
+        using var select = connection.CreateCommand();
+        select.CommandText = "SELECT configuration_json_str FROM collections WHERE name = $name";
+        select.Parameters.AddWithValue("$name", name);
+        return (string)select.ExecuteScalar()!;
+    }
+}
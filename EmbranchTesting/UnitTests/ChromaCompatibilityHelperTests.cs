@@ -0,0 +1,225 @@
+using NUnit.Framework;
+using Embranch.Services;
+using System.IO;
+
+namespace EmbranchTesting.UnitTests
+{
+    /// <summary>
+    /// Unit tests for the pure helpers of ChromaCompatibilityHelper.
+    /// Migration and client validation are covered by OutOfDateDatabaseMigrationTests as they require PythonContext.
+    /// </summary>
+    [TestFixture]
+    [Category("Unit")]
+    public class ChromaCompatibilityHelperTests
+    {
+        private string _tempDir = null!;
+
+        [SetUp]
+        public void SetUp()
+        {
+            _tempDir = Path.Combine(Path.GetTempPath(), $"ChromaCompatibilityHelperTest_{Guid.NewGuid():N}");
+            Directory.CreateDirectory(_tempDir);
+        }
+
+        [TearDown]
+        public void TearDown()
+        {
+            if (Directory.Exists(_tempDir))
+            {
+                try
+                {
+                    Directory.Delete(_tempDir, recursive: true);
+                }
+                catch
+                {
+                    // Ignore cleanup errors
+                }
+            }
+        }
+
+        #region FindSqliteFile Tests
+
+        /// <summary>
+        /// Verifies that chroma.sqlite3 wins over the other known file names regardless of enumeration order
+        /// </summary>
+        [Test]
+        public void FindSqliteFile_MultipleCandidates_PrefersChromaSqlite3()
+        {
+            File.WriteAllText(Path.Combine(_tempDir, "database.db"), string.Empty);
+            File.WriteAllText(Path.Combine(_tempDir, "chroma.db"), string.Empty);
+            File.WriteAllText(Path.Combine(_tempDir, "other.sqlite3"), string.Empty);
+            File.WriteAllText(Path.Combine(_tempDir, "chroma.sqlite3"), string.Empty);
+
+            var result = ChromaCompatibilityHelper.FindSqliteFile(_tempDir);
+
+            Assert.That(result, Is.EqualTo(Path.Combine(_tempDir, "chroma.sqlite3")));
+        }
+
+        /// <summary>
+        /// Verifies that a known file name is preferred over an arbitrary *.sqlite3 file
+        /// </summary>
+        [Test]
+        public void FindSqliteFile_KnownNameAndFallback_PrefersKnownName()
+        {
+            File.WriteAllText(Path.Combine(_tempDir, "other.sqlite3"), string.Empty);
+            File.WriteAllText(Path.Combine(_tempDir, "database.db"), string.Empty);
+
+            var result = ChromaCompatibilityHelper.FindSqliteFile(_tempDir);
+
+            Assert.That(result, Is.EqualTo(Path.Combine(_tempDir, "database.db")));
+        }
+
+        /// <summary>
+        /// Verifies the *.sqlite3 fallback when no known file name is present
+        /// </summary>
+        [Test]
+        public void FindSqliteFile_OnlyFallback_ReturnsSqlite3File()
+        {
+            File.WriteAllText(Path.Combine(_tempDir, "notes.txt"), string.Empty);
+            File.WriteAllText(Path.Combine(_tempDir, "legacy.sqlite3"), string.Empty);
+
+            var result = ChromaCompatibilityHelper.FindSqliteFile(_tempDir);
+
+            Assert.That(result, Is.EqualTo(Path.Combine(_tempDir, "legacy.sqlite3")));
+        }
+
+        /// <summary>
+        /// Verifies that the fallback choice does not depend on directory enumeration order
+        /// </summary>
+        [Test]
+        public void FindSqliteFile_SeveralFallbacks_PicksOrdinalFirst()
+        {
+            File.WriteAllText(Path.Combine(_tempDir, "zeta.sqlite3"), string.Empty);
+            File.WriteAllText(Path.Combine(_tempDir, "alpha.sqlite3"), string.Empty);
+            File.WriteAllText(Path.Combine(_tempDir, "mid.sqlite3"), string.Empty);
+
+            var result = ChromaCompatibilityHelper.FindSqliteFile(_tempDir);
+
+            Assert.That(result, Is.EqualTo(Path.Combine(_tempDir, "alpha.sqlite3")));
+        }
+
+        /// <summary>
+        /// Verifies that directories are ignored and null is returned when nothing matches
+        /// </summary>
+        [Test]
+        public void FindSqliteFile_NoSqliteFiles_ReturnsNull()
+        {
+            Directory.CreateDirectory(Path.Combine(_tempDir, "chroma.sqlite3"));
+            File.WriteAllText(Path.Combine(_tempDir, "notes.txt"), string.Empty);
+
+            Assert.That(ChromaCompatibilityHelper.FindSqliteFile(_tempDir), Is.Null);
+        }
+
+        /// <summary>
+        /// Verifies that known names match case-insensitively where the default file system does
+        /// (Windows, macOS) and exactly elsewhere; the returned path keeps the on-disk casing
+        /// </summary>
+        [Test]
+        public void FindSqliteFile_DifferentlyCasedKnownName_FollowsPlatformCaseSensitivity()
+        {
+            File.WriteAllText(Path.Combine(_tempDir, "Chroma.sqlite3"), string.Empty);
+            File.WriteAllText(Path.Combine(_tempDir, "database.db"), string.Empty);
+
+            var result = ChromaCompatibilityHelper.FindSqliteFile(_tempDir);
+
+            var expectedName = OperatingSystem.IsWindows() || OperatingSystem.IsMacOS() ? "Chroma.sqlite3" : "database.db";
+            Assert.That(result, Is.EqualTo(Path.Combine(_tempDir, expectedName)));
+        }
+
+        /// <summary>
+        /// Verifies that a missing directory returns null instead of throwing
+        /// </summary>
+        [Test]
+        public void FindSqliteFile_MissingDirectory_ReturnsNull()
+        {
+            var missing = Path.Combine(_tempDir, "does-not-exist");
+
+            Assert.That(ChromaCompatibilityHelper.FindSqliteFile(missing), Is.Null);
+        }
+
+        #endregion
+
+        #region HasTopLevelProperty Tests
+
+        /// <summary>
+        /// Verifies that only top-level properties are reported, not nested ones
+        /// </summary>
+        [Test]
+        [TestCase("{\"_type\":\"CollectionConfigurationInternal\",\"hnsw\":{}}", true)]
+        [TestCase("{\"hnsw\":{\"space\":\"l2\"},\"_type\":null}", true)]
+        [TestCase("{\"hnsw\":{\"_type\":\"nested\"}}", false)]
+        [TestCase("{\"embedding_function\":{\"args\":[1,2,{\"_type\":1}]}}", false)]
+        [TestCase("{}", false)]
+        public void HasTopLevelProperty_JsonObject_DetectsTopLevelKeyOnly(string json, bool expected)
+        {
+            Assert.That(ChromaCompatibilityHelper.HasTopLevelProperty(json, "_type"), Is.EqualTo(expected));
+        }
+
+        /// <summary>
+        /// Verifies that invalid JSON and non-object documents return null, even when the key appears early
+        /// </summary>
+        [Test]
+        [TestCase("")]
+        [TestCase("{not json")]
+        [TestCase("{\"_type\":\"x\",")]
+        [TestCase("{\"_type\":\"x\"} trailing")]
+        [TestCase("[1,2]")]
+        [TestCase("\"_type\"")]
+        [TestCase("{\"_type\":\"x\",\"ef\":NaN}")]
+        public void HasTopLevelProperty_InvalidOrNonObject_ReturnsNull(string json)
+        {
+            Assert.That(ChromaCompatibilityHelper.HasTopLevelProperty(json, "_type"), Is.Null);
+        }
+
+        #endregion
+
+        #region SummarizeNames Tests
+
+        /// <summary>
+        /// Verifies that short lists are joined in full and long lists are capped with a remainder count
+        /// </summary>
+        [Test]
+        [TestCase(3, "c0, c1, c2")]
+        [TestCase(10, "c0, c1, c2, c3, c4, c5, c6, c7, c8, c9")]
+        [TestCase(13, "c0, c1, c2, c3, c4, c5, c6, c7, c8, c9 and 3 more")]
+        public void SummarizeNames_CapsListedNames(int count, string expected)
+        {
+            var names = Enumerable.Range(0, count).Select(i => $"c{i}").ToList();
+
+            Assert.That(ChromaCompatibilityHelper.SummarizeNames(names), Is.EqualTo(expected));
+        }
+
+        #endregion
+
+        #region BuildSqliteFileUri Tests
+
+        /// <summary>
+        /// Verifies that the host of a UNC path ends up in the URI path, since SQLite rejects
+        /// any authority other than empty or localhost
+        /// </summary>
+        [Test]
+        [TestCase(@"\\server\share\chroma.sqlite3", "file:////server/share/chroma.sqlite3")]
+        [TestCase(@"\\server\share\my data\chroma.sqlite3", "file:////server/share/my%20data/chroma.sqlite3")]
+        public void BuildSqliteFileUri_UncPath_KeepsHostInPath(string path, string expected)
+        {
+            Assert.That(ChromaCompatibilityHelper.BuildSqliteFileUri(path), Is.EqualTo(expected));
+        }
+
+        /// <summary>
+        /// Verifies that local paths get an empty authority and URI-reserved characters are escaped
+        /// </summary>
+        [Test]
+        public void BuildSqliteFileUri_LocalPath_UsesEmptyAuthority()
+        {
+            var path = Path.Combine(_tempDir, "my data#1", "chroma.sqlite3");
+
+            var result = ChromaCompatibilityHelper.BuildSqliteFileUri(path);
+
+            Assert.That(result, Does.StartWith("file:///"));
+            Assert.That(result, Does.Contain("my%20data%231"));
+            Assert.That(new Uri(result).LocalPath, Is.EqualTo(path));
+        }
+
+        #endregion
+    }
+}